@@ -1,4 +1,8 @@
 from .analyticord import *
+from .buckets import *
 from .errors import *
+from .manager import *
+from .recorder import *
+from .tracing import *
 
 __version__ = '0.3.0'
@@ -1,21 +1,28 @@
 import asyncio
+import collections
+import json
 import logging
 import typing
+import zlib
 
 import aiohttp
 
 from analyticord import errors
+from analyticord.buckets import CounterRing
+from analyticord.tracing import _NULL_SPAN, Tracer
 
 logger = logging.getLogger("analyticord")
 
 
-def route(*ends) -> str:
+API_BASE = "https://analyticord.solutions"
+
+
+def route(*ends, base: str=API_BASE) -> str:
     """Formats into a route.
 
     route("api", "botLogin") -> "https://analyticord.solutions/api/botLogin
     """
-    s = "https://analyticord.solutions"
-    return "/".join((s, *ends))
+    return "/".join((base, *ends))
 
 
 def _make_error(error, **kwargs) -> errors.ApiError:
@@ -44,9 +51,9 @@ class EventProxy:
     def __str__(self):
         return "Analyticord event: {}".format(self.__class__.__name__)
 
-    def send(self, value: typing.Any):
+    def send(self, value: typing.Any, timestamp: float=None):
         """Invoke this events send message."""
-        return self.analytics.send(self.anal_name, value)
+        return self.analytics.send(self.anal_name, value, timestamp)
 
     def hook_bot(self, bot, dpy_name: str):
         """Hook a discord event to commiting the relevent action for this event.
@@ -58,18 +65,58 @@ class EventProxy:
         async def _hook(*_, **__):
             await self.send(True)
 
-        bot.add_listener(_hook, dpy_name)
+        self._add_listener(bot, _hook, dpy_name)
+
+    def _add_listener(self, bot, hook, dpy_name: str):
+        """Add a listener to the bot, recording it if the analytics has a recorder."""
+
+        async def _listener(*args, **kwargs):
+            recorder = self.analytics.recorder
+            if recorder is not None:
+                if recorder.closed:
+                    self.analytics.recorder = None
+                else:
+                    recorder.record(self.anal_name)
+
+            tracer = self.analytics.tracer
+            if tracer is None:
+                await hook(*args, **kwargs)
+            else:
+                with tracer.span("hook", event=self.anal_name, dpy_event=dpy_name):
+                    await hook(*args, **kwargs)
+
+        bot.add_listener(_listener, dpy_name)
 
 
 class MessageEventProxy(EventProxy):
     """Basically, only message event takes a delta value.
     Everything else is exact, so half the stuff in EventProxy is useless for anything but `messages`
+
+    Messages are counted into a :class:`analyticord.buckets.CounterRing` with one bucket
+    per event interval, and each bucket is sent with its own timestamp,
+    so a late or failed update does not merge counts from several intervals.
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, buckets: int=60, **kwargs):
+        """
+        :param buckets: Number of intervals of counts kept while updates are failing.
+        """
         super().__init__(*args, **kwargs)
         self.lock = asyncio.Lock()
-        self.counter = 0
+        self.buckets = CounterRing(self.analytics.event_interval, buckets)
+
+    @property
+    def counter(self) -> int:
+        """Number of messages counted but not yet sent.
+        Setting this discards every unsent bucket, then counts the new value now.
+        """
+        return self.buckets.total
+
+    @counter.setter
+    def counter(self, value: int):
+        self.buckets.clear()
+        if value:
+            self.buckets.add(value)
 
     def __str__(self):
         return "{}, counting {} messages".format(super().__str__(), self.counter)
@@ -84,31 +131,48 @@ class MessageEventProxy(EventProxy):
         async def _hook(*_, **__):
             await self.increment()
 
-        bot.add_listener(_hook, dpy_name)
+        self._add_listener(bot, _hook, dpy_name)
+
+    async def _acquire(self):
+        with self.analytics._span("lock", event=self.anal_name):
+            await self.lock.acquire()
 
     async def increment(self):
         """Increment this events counter."""
-        async with self.lock:
-            self.counter += 1
+        self.buckets.add()
+
+    async def _flush(self, include_current: bool):
+        # counts are only removed once sent, so on failure they are retried next update
+        await self._acquire()
+        try:
+            resp = None
+            for epoch, count in self.buckets.pending(include_current):
+                resp = await self.send(count, self.buckets.timestamp(epoch))
+                self.buckets.remove(epoch, count)
+            return resp
+        finally:
+            self.lock.release()
 
     async def update_now(self):
-        """Trigger an update of this event, resetting the counter."""
-        async with self.lock:
-            resp = await self.send(self.counter)
-            self.counter = 0
-            return resp
+        """Trigger an update of this event, sending every bucket of counts, oldest first.
 
-    async def _update_once(self):
-        if self.counter:
-            try:
-                await self.update_now()
-            except errors.ApiError as e:
-                logger.error(str(e))
+        :return: Dict response from api for the newest bucket.
+        :raises: :class:`analyticord.errors.ApiError`.
+        """
+        resp = await self._flush(include_current=True)
+        if resp is None:
+            resp = await self.send(0)
+        return resp
 
-    async def _update_events_loop(self):
-        while True:
-            await asyncio.sleep(self.analytics.event_interval)
-            await self._update_once()
+    async def _update_once(self, include_current: bool=False):
+        if self.buckets.dropped:
+            logger.warning("Dropped %d %s counted while updates were failing",
+                           self.buckets.dropped, self.anal_name)
+            self.buckets.dropped = 0
+        try:
+            await self._flush(include_current)
+        except (errors.ApiError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("Failed to update %s, retrying next update: %r", self.anal_name, e)
 
 
 class ErrorEventProxy(EventProxy):
@@ -124,7 +188,7 @@ class ErrorEventProxy(EventProxy):
         async def _hook(ctx, exception):
             await self.send("command: {}. error: {}.".format(ctx, exception))
 
-        bot.add_listener(_hook, dpy_name)
+        self._add_listener(bot, _hook, dpy_name)
 
 
 class GuildJoinEventProxy(EventProxy):
@@ -140,7 +204,7 @@ class GuildJoinEventProxy(EventProxy):
         async def _hook(*_, **__):
             await self.send(len(bot.guilds))
 
-        bot.add_listener(_hook, dpy_name)
+        self._add_listener(bot, _hook, dpy_name)
 
 
 class CommandUsedEventProxy(EventProxy):
@@ -156,7 +220,147 @@ class CommandUsedEventProxy(EventProxy):
         async def _hook(ctx):
             await self.send(ctx.command.name)
 
-        bot.add_listener(_hook, dpy_name)
+        self._add_listener(bot, _hook, dpy_name)
+
+
+class GuildDetailsEventProxy(EventProxy):
+    """Proxy class for the guild details event.
+
+    A compact hash of the last sent details of each guild is kept, and each update
+    only sends the guilds that were added, changed or removed since the last one.
+    Every ``resync_every`` updates, the details of every guild are sent instead.
+
+    Updates are sent as a json object of the form
+    ``{"full": bool, "guilds": [details, ...], "removed": [guild id, ...]}``.
+
+    .. note::
+        Before this proxy, ``guildDetails`` was a plain :class:`EventProxy` that sent ``True``
+        for each hooked event. Anything reading ``guildDetails`` data must handle this new payload.
+    """
+
+    _hooked_events = ("on_guild_join", "on_guild_update", "on_guild_remove",
+                      "on_member_join", "on_member_remove")
+
+    def __init__(self, *args, resync_every: int=60, **kwargs):
+        """
+        :param resync_every: Number of updates between sending the details of every guild.
+        """
+        super().__init__(*args, **kwargs)
+        self.resync_every = resync_every
+        self.bot = None
+        self.hashes = {}  # type: typing.Dict[int, int]
+        self.dirty = set()  # type: typing.Set[int]
+        self.removed = set()  # type: typing.Set[int]
+        self._until_resync = 0
+
+    def __str__(self):
+        return "{}, tracking {} guilds".format(super().__str__(), len(self.hashes))
+
+    @staticmethod
+    def details(guild) -> dict:
+        """Get the details reported for a guild.
+        Override this to change what is reported.
+
+        :param guild: A discord.py :class:`discord.Guild`.
+        """
+        return {"id": str(guild.id),
+                "name": guild.name,
+                "members": guild.member_count,
+                "owner": str(guild.owner_id)}
+
+    def hook_bot(self, bot, dpy_name: str=None):
+        """Hook the guild join, update and remove events of a bot to track which guilds changed.
+        Member join and remove events are hooked too, as they change a guild's member count.
+
+        :param bot: An instance of a discord.py :class:`discord.ext.commands.Bot`.
+        :param dpy_name:
+            Name of an extra discord.py event that triggers a full resync on the next update.
+            Events that are already hooked are ignored.
+        """
+        self.bot = bot
+
+        async def _changed(*guilds):
+            guild = guilds[-1]
+            self.removed.discard(guild.id)
+            self.dirty.add(guild.id)
+
+        async def _removed(guild):
+            self.dirty.discard(guild.id)
+            self.removed.add(guild.id)
+
+        async def _member_changed(member):
+            if member.guild.id not in self.removed:
+                self.dirty.add(member.guild.id)
+
+        self._add_listener(bot, _changed, "on_guild_join")
+        self._add_listener(bot, _changed, "on_guild_update")
+        self._add_listener(bot, _removed, "on_guild_remove")
+        self._add_listener(bot, _member_changed, "on_member_join")
+        self._add_listener(bot, _member_changed, "on_member_remove")
+
+        if dpy_name is not None and dpy_name not in self._hooked_events:
+
+            async def _resync(*_, **__):
+                self._until_resync = 0
+
+            self._add_listener(bot, _resync, dpy_name)
+
+    async def update_now(self, full: bool=False):
+        """Send the details of guilds that were added, changed or removed since the last update.
+
+        :param full: Send the details of every guild.
+        :return: Dict response from api, or None if nothing changed.
+        :raises: :class:`analyticord.errors.ApiError`.
+        """
+        dirty, self.dirty = self.dirty, set()
+        removed, self.removed = self.removed, set()
+
+        if full:
+            guilds = self.bot.guilds
+            gone = set(self.hashes).difference(g.id for g in guilds)
+        else:
+            guilds = [g for g in map(self.bot.get_guild, dirty) if g is not None]
+            gone = removed.intersection(self.hashes)
+
+        hashes = {}
+        changed = []
+        for guild in guilds:
+            details = self.details(guild)
+            hashed = zlib.crc32(json.dumps(details, sort_keys=True).encode("utf-8"))
+            if full or self.hashes.get(guild.id) != hashed:
+                changed.append(details)
+            hashes[guild.id] = hashed
+
+        resp = None
+        if full or changed or gone:
+            data = json.dumps({"full": full,
+                               "guilds": changed,
+                               "removed": [str(i) for i in gone]})
+            try:
+                resp = await self.send(data)
+            except BaseException:
+                # guilds that changed while sending are already in the new sets
+                self.dirty.update(dirty.difference(self.removed))
+                self.removed.update(removed.difference(self.dirty))
+                raise
+
+        if full:
+            self.hashes = hashes
+            self._until_resync = self.resync_every - 1
+        else:
+            self.hashes.update(hashes)
+            for i in gone:
+                del self.hashes[i]
+            self._until_resync -= 1
+        return resp
+
+    async def _update_once(self, include_current: bool=False):
+        if self.bot is None:
+            return
+        try:
+            await self.update_now(full=self._until_resync <= 0)
+        except (errors.ApiError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("Failed to update %s, retrying next update: %r", self.anal_name, e)
 
 
 class AnalytiCord:
@@ -185,7 +389,7 @@ class AnalytiCord:
     guildLeave        :class:`EventProxy`
     disconnect        :class:`EventProxy`
     voiceChannelJoin  :class:`EventProxy`
-    guildDetails      :class:`EventProxy`
+    guildDetails      :class:`GuildDetailsEventProxy`
     mentions          :class:`EventProxy`
     commands_used     :class:`CommandUsedEventProxy`
     ================= ================================
@@ -198,7 +402,7 @@ class AnalytiCord:
                         ("guildLeave", EventProxy),
                         ("disconnect", EventProxy),
                         ("voiceChannelJoin", EventProxy),
-                        ("guildDetails", EventProxy),
+                        ("guildDetails", GuildDetailsEventProxy),
                         ("mentions", EventProxy),
                         ("commands_used", CommandUsedEventProxy))
 
@@ -207,13 +411,17 @@ class AnalytiCord:
                  user_token: str=None,
                  event_interval: int=60,
                  session: aiohttp.ClientSession=None,
-                 loop=None):
+                 loop=None,
+                 api_base: str=API_BASE,
+                 tracer: Tracer=None):
         """
         :param token: Your AnalytiCord bot token.
         :param user_token:
             Your AnalytiCord user token.
             This is not required unless you wish to use endpoints that require User auth.
         :param event_interval: The interval between sending event updates in seconds.
+        :param api_base: Base url of the api, useful for pointing at a local server.
+        :param tracer: A :class:`analyticord.tracing.Tracer` to time hooks and requests with.
 
         """
 
@@ -229,6 +437,15 @@ class AnalytiCord:
         #: Interval between sending event updates
         self.event_interval = event_interval
 
+        #: Base url of the api
+        self.api_base = api_base
+
+        #: :class:`analyticord.recorder.TraceRecorder` that hooked events are recorded to, if any
+        self.recorder = None
+
+        #: :class:`analyticord.tracing.Tracer` timing hooks and requests, if any
+        self.tracer = tracer
+
         if user_token is not None:
             self.user_token = "user {}".format(user_token)
 
@@ -242,6 +459,14 @@ class AnalytiCord:
     def __str__(self):
         return "Analyticord instance. Fired {} events".format(self.sent_events)
 
+    def _span(self, name: str, **attrs):
+        if self.tracer is None:
+            return _NULL_SPAN
+        return self.tracer.span(name, **attrs)
+
+    def _route(self, *ends) -> str:
+        return route(*ends, base=self.api_base)
+
     @property
     def _auth(self):
         return {"Authorization": self.token}
@@ -267,13 +492,15 @@ class AnalytiCord:
         """
         self.events[anal_name] = proxy_type(self, anal_name)
 
-    async def _do_request(self, rtype: str, endpoint: str, auth, **kwargs):
-        async with self.session.request(
-                rtype, endpoint, headers=auth, **kwargs) as resp:
-            body = await resp.json()
-            if resp.status != 200:
-                raise _make_error(body, status=resp.status)
-            return body
+    async def _do_request(self, rtype: str, endpoint: str, auth, event: str=None, **kwargs):
+        with self._span("http", event=event, method=rtype, endpoint=endpoint):
+            async with self.session.request(
+                    rtype, endpoint, headers=auth, **kwargs) as resp:
+                with self._span("decode", event=event, endpoint=endpoint):
+                    body = await resp.json()
+                if resp.status != 200:
+                    raise _make_error(body, status=resp.status)
+                return body
 
     async def start(self):
         """Fire a login event.
@@ -282,31 +509,53 @@ class AnalytiCord:
         :raises: :class:`analyticord.errors.ApiError`.
         """
         resp = await self._do_request("get",
-                                      route("api", "botLogin"), self._auth)
-        self.updater = self.loop.create_task(
-            self.messages._update_events_loop())
+                                      self._route("api", "botLogin"), self._auth)
+        if self.updater is None:
+            self.updater = self.loop.create_task(self._update_events_loop())
         self.sent_events = 0
         return resp
 
     async def stop(self):
         """Update all events and stop the analyticord updater loop."""
-        self.updater.cancel()
-        await self.messages._update_once()
+        if self.updater is not None:
+            self.updater.cancel()
+            self.updater = None
+        await self._update_once(include_current=True)
+
+    async def _update_once(self, include_current: bool=False):
+        await asyncio.gather(*(e._update_once(include_current)
+                               for e in self.events.values()
+                               if hasattr(e, "_update_once")))
+
+    async def _update_events_loop(self):
+        while True:
+            await asyncio.sleep(self.event_interval)
+            try:
+                await self._update_once()
+            except Exception:
+                # one failed update shouldn't stop the rest from happening
+                logger.exception("Failed to update events")
 
-    async def send(self, event_type: str, data: str) -> dict:
+    async def send(self, event_type: str, data: str, timestamp: float=None) -> dict:
         """Send data to analyticord.
 
         :param event_type: Event type to send.
         :param data: Data to send.
+        :param timestamp: Unix timestamp the data is for, defaults to when it is received.
         :return: Dict response from api.
         :raises: :class:`analyticord.errors.ApiError`.
         """
         self.sent_events += 1
+        form = dict(eventType=event_type, data=data)
+        if timestamp is not None:
+            # kept to the millisecond, so sub-second buckets get distinct timestamps
+            form["timestamp"] = round(timestamp, 3)
         return await self._do_request(
             "post",
-            route("api", "submit"),
+            self._route("api", "submit"),
             self._auth,
-            data=dict(eventType=event_type, data=data))
+            event=event_type,
+            data=form)
 
     async def get(self, **attrs) -> list:
         """Get data from the api.
@@ -316,7 +565,7 @@ class AnalytiCord:
         :raises:  :class:`analyticord.errors.ApiError`.
         """
         return await self._do_request(
-            "get", route("api", "getData"), self._user_auth, params=attrs)
+            "get", self._route("api", "getData"), self._user_auth, params=attrs)
 
     async def bot_info(self, id: int) -> dict:
         """Get info for a bot id.
@@ -326,7 +575,7 @@ class AnalytiCord:
         :raises: :class:`analyticord.errors.ApiError`.
         """
         return await self._do_request(
-            "get", route("api", "botinfo"), self._user_auth, params={"id": id})
+            "get", self._route("api", "botinfo"), self._user_auth, params={"id": id})
 
     async def bot_list(self) -> list:
         """Get list of bots owned by this auth.
@@ -335,4 +584,73 @@ class AnalytiCord:
         :raises: :class:`analyticord.errors.ApiError`.
         """
         return await self._do_request("get",
-                                      route("api", "botlist"), self._user_auth)
+                                      self._route("api", "botlist"), self._user_auth)
+
+    def bot_info_many(self, ids: typing.Iterable[int], limit: int=5
+                      ) -> typing.Iterator[typing.Awaitable[tuple]]:
+        """Get info for many bot ids, with at most ``limit`` requests in flight.
+
+        Duplicate ids are only requested once.
+        Like :func:`asyncio.as_completed`, this returns an iterator of awaitables
+        in the order the requests complete. Each awaitable resolves to a tuple
+        of ``(id, result)``, where ``result`` is either the bot info or the
+        exception raised while fetching it, so one failing id does not abort the rest.
+
+        .. code-block:: python3
+
+            for fut in analytics.bot_info_many(ids):
+                id, info = await fut
+
+        All requests are scheduled when this is called, so callers must drain the
+        iterator; requests still pending when a caller stops early are sent anyway.
+        :meth:`bot_info_bulk` cancels them for you when it is cancelled.
+
+        :param ids: The IDs of the bots to get info for.
+        :param limit: Maximum number of concurrent requests.
+        :return: Iterator of awaitables resolving to ``(id, result)`` tuples.
+        """
+        return asyncio.as_completed(self._bot_info_tasks(ids, limit))
+
+    def _bot_info_tasks(self, ids: typing.Iterable[int], limit: int) -> list:
+        sem = asyncio.Semaphore(limit)
+
+        async def _fetch(id):
+            with self._span("queue", endpoint="botinfo"):
+                await sem.acquire()
+            try:
+                return id, await self.bot_info(id)
+            except Exception as e:
+                return id, e
+            finally:
+                sem.release()
+
+        return [self.loop.create_task(_fetch(i))
+                for i in collections.OrderedDict.fromkeys(ids)]
+
+    async def bot_info_bulk(self, ids: typing.Iterable[int]=None, limit: int=5
+                            ) -> typing.Tuple[dict, dict]:
+        """Get info for many bot ids, collecting results and errors per id.
+        If this is cancelled, requests that haven't finished are cancelled too.
+
+        :param ids: The IDs of the bots to get info for.
+            If not given, every bot returned by :meth:`bot_list` is used.
+        :param limit: Maximum number of concurrent requests.
+        :return: A tuple of ``(results, errors)``, both dicts keyed by bot id.
+        :raises: :class:`analyticord.errors.ApiError` if fetching the bot list fails.
+        """
+        if ids is None:
+            ids = [bot["id"] for bot in await self.bot_list()]
+
+        results, failed = {}, {}
+        tasks = self._bot_info_tasks(ids, limit)
+        try:
+            for fut in asyncio.as_completed(tasks):
+                id, result = await fut
+                if isinstance(result, Exception):
+                    failed[id] = result
+                else:
+                    results[id] = result
+        finally:
+            for task in tasks:
+                task.cancel()
+        return results, failed
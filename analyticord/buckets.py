@@ -0,0 +1,101 @@
+import array
+import math
+import time
+import typing
+
+__all__ = ("CounterRing",)
+
+
+class CounterRing:
+    """Fixed size ring of counters, one per time bucket.
+
+    Counts are added to the bucket for the current time, so counts from
+    different intervals are never merged, even if they are flushed late.
+    Memory use is constant: once the ring wraps around, the oldest unflushed
+    bucket is overwritten and its count added to :attr:`dropped`.
+
+    Buckets are identified by their epoch: the time they start at divided by the bucket width.
+    """
+
+    def __init__(self, width: float, size: int=60):
+        """
+        :param width: Width of each bucket in seconds.
+        :param size: Number of buckets kept.
+        """
+        if width <= 0 or size <= 0:
+            raise ValueError("Bucket width and size must be positive.")
+
+        #: Width of each bucket in seconds
+        self.width = width
+
+        #: Number of buckets kept
+        self.size = size
+
+        #: Number of counts lost to overwritten buckets
+        self.dropped = 0
+
+        self.epochs = array.array("q", [-1]) * size
+        self.counts = array.array("Q", [0]) * size
+
+    def __str__(self):
+        return "Counter ring of {} {}s buckets, counting {}".format(self.size, self.width, self.total)
+
+    @property
+    def total(self) -> int:
+        """Total count across all unflushed buckets."""
+        return sum(self.counts)
+
+    def epoch(self, now: float=None) -> int:
+        """Get the epoch of the bucket for a time.
+
+        :param now: Unix timestamp, defaults to the current time.
+        """
+        # floor of true division, as // is off by one for widths like 0.1
+        return math.floor((time.time() if now is None else now) / self.width)
+
+    def timestamp(self, epoch: int) -> float:
+        """Get the unix timestamp a bucket starts at."""
+        return epoch * self.width
+
+    def add(self, n: int=1, now: float=None):
+        """Add to the count of the bucket for a time.
+
+        :param n: Amount to add.
+        :param now: Unix timestamp, defaults to the current time.
+        """
+        epoch = self.epoch(now)
+        slot = epoch % self.size
+        if self.epochs[slot] != epoch:
+            self.dropped += self.counts[slot]
+            self.epochs[slot] = epoch
+            self.counts[slot] = 0
+        self.counts[slot] += n
+
+    def pending(self, include_current: bool=False, now: float=None
+                ) -> typing.List[typing.Tuple[int, int]]:
+        """Get the non-empty buckets, oldest first.
+
+        :param include_current: Whether to include the bucket that is still being counted into.
+        :param now: Unix timestamp, defaults to the current time.
+        :return: List of ``(epoch, count)`` tuples.
+        """
+        current = self.epoch(now)
+        return sorted((self.epochs[i], self.counts[i])
+                      for i in range(self.size)
+                      if self.counts[i] and (include_current or self.epochs[i] < current))
+
+    def clear(self):
+        """Discard every bucket."""
+        for i in range(self.size):
+            self.epochs[i] = -1
+            self.counts[i] = 0
+
+    def remove(self, epoch: int, n: int):
+        """Remove flushed counts from a bucket.
+
+        :param epoch: Epoch of the bucket.
+        :param n: Amount to remove.
+        """
+        slot = epoch % self.size
+        if self.epochs[slot] == epoch:
+            self.counts[slot] -= min(n, self.counts[slot])
@@ -0,0 +1,191 @@
+"""Replay event traces recorded by :class:`analyticord.recorder.TraceRecorder`.
+
+Usage::
+
+    analyticord-replay events.trace --url http://localhost:8080 --speed 10
+"""
+
+import argparse
+import asyncio
+import collections
+import types
+
+import aiohttp
+
+from analyticord.analyticord import AnalytiCord, GuildDetailsEventProxy, MessageEventProxy
+from analyticord.recorder import read_trace
+
+
+class ReplayAnalytiCord(AnalytiCord):
+    """AnalytiCord that counts the requests sent for each event type."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = collections.Counter()
+
+    async def send(self, event_type: str, data: str, timestamp: float=None) -> dict:
+        self.requests[event_type] += 1
+        return await super().send(event_type, data, timestamp)
+
+
+class _ReplayBot:
+    """Stand-in bot for replaying guildDetails events.
+
+    Each event is dispatched as an update of a new guild, so the proxy batches
+    them into one request per interval just like it would for a real bot.
+    """
+
+    def __init__(self):
+        self.guilds = []
+        self.listeners = collections.defaultdict(list)
+
+    def add_listener(self, func, name: str):
+        self.listeners[name].append(func)
+
+    def get_guild(self, id: int):
+        return self.guilds[id]
+
+    async def update_guild(self):
+        guild = types.SimpleNamespace(
+            id=len(self.guilds), name="replay", member_count=0, owner_id=0)
+        self.guilds.append(guild)
+        for listener in self.listeners["on_guild_update"]:
+            await listener(guild, guild)
+
+
+async def replay(analytics: ReplayAnalytiCord, trace, speed: float=1.0) -> dict:
+    """Replay a trace against the event proxies of an :class:`AnalytiCord`.
+
+    Events are fired at their recorded offsets divided by ``speed``,
+    without waiting for earlier events to finish.
+    ``guildDetails`` events are replayed as guild updates of a stand-in bot.
+
+    :param analytics: The :class:`AnalytiCord` to fire events on.
+    :param trace: Iterable of ``(seconds since start, event type)`` tuples.
+    :param speed: How many times faster than recorded to replay.
+    :return: Dict of replay statistics.
+    """
+    loop = analytics.loop
+    events = collections.Counter()
+    failures = collections.Counter()
+    lags = []
+    pending = set()
+    max_pending = 0
+    max_behind = 0.0
+
+    async def _fire(proxy, due):
+        try:
+            if isinstance(proxy, MessageEventProxy):
+                await proxy.increment()
+            elif isinstance(proxy, GuildDetailsEventProxy):
+                await proxy.bot.update_guild()
+            else:
+                await proxy.send(True)
+        except Exception:
+            failures[proxy.anal_name] += 1
+        lags.append(loop.time() - due)
+
+    for proxy in analytics.events.values():
+        if isinstance(proxy, GuildDetailsEventProxy):
+            proxy.hook_bot(_ReplayBot())
+
+    updater = loop.create_task(analytics._update_events_loop())
+    start = loop.time()
+    try:
+        for offset, event_type in trace:
+            due = start + offset / speed
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                max_behind = max(max_behind, -delay)
+
+            if event_type not in analytics.events:
+                analytics.register(event_type)
+            events[event_type] += 1
+
+            task = loop.create_task(_fire(analytics.events[event_type], due))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            max_pending = max(max_pending, len(pending))
+
+        if pending:
+            await asyncio.wait(pending)
+        await analytics._update_once(include_current=True)
+    finally:
+        updater.cancel()
+
+    elapsed = loop.time() - start
+    requests = analytics.requests
+    return {
+        "elapsed": elapsed,
+        "events": events,
+        "requests": requests,
+        "failures": failures,
+        "events_per_second": sum(events.values()) / elapsed if elapsed else 0.0,
+        "requests_per_second": sum(requests.values()) / elapsed if elapsed else 0.0,
+        "max_dispatch_behind": max_behind,
+        "mean_lag": sum(lags) / len(lags) if lags else 0.0,
+        "max_lag": max(lags, default=0.0),
+        "max_pending": max_pending,
+    }
+
+
+def _format_report(stats: dict) -> str:
+    lines = [
+        "Replayed {} events in {:.2f}s".format(sum(stats["events"].values()), stats["elapsed"]),
+        "Throughput: {:.1f} events/s, {:.1f} requests/s".format(
+            stats["events_per_second"], stats["requests_per_second"]),
+        "Dispatch fell behind by at most {:.3f}s".format(stats["max_dispatch_behind"]),
+        "Event lag: mean {:.3f}s, max {:.3f}s, at most {} in flight".format(
+            stats["mean_lag"], stats["max_lag"], stats["max_pending"]),
+        "",
+        "{:<20} {:>10} {:>10} {:>10}".format("event", "events", "requests", "failures"),
+    ]
+    for name in sorted(stats["events"]):
+        lines.append("{:<20} {:>10} {:>10} {:>10}".format(
+            name, stats["events"][name], stats["requests"][name], stats["failures"][name]))
+    return "\n".join(lines)
+
+
+async def _run(args) -> dict:
+    async with aiohttp.ClientSession() as session:
+        analytics = ReplayAnalytiCord(
+            args.token,
+            event_interval=args.interval / args.speed,
+            session=session,
+            api_base=args.url)
+        return await replay(analytics, read_trace(args.trace), args.speed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="analyticord-replay",
+        description="Replay a recorded event trace against an analyticord server.")
+    parser.add_argument("trace", help="Path of the trace file to replay.")
+    parser.add_argument(
+        "--url", default="http://localhost:8080",
+        help="Base url of the server to send events to.")
+    parser.add_argument(
+        "--speed", type=float, default=1.0,
+        help="How many times faster than recorded to replay.")
+    parser.add_argument(
+        "--token", default="replay", help="Bot token to send events with.")
+    parser.add_argument(
+        "--interval", type=float, default=60,
+        help="Event update interval in recorded seconds.")
+    args = parser.parse_args(argv)
+
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    loop = asyncio.get_event_loop()
+    try:
+        stats = loop.run_until_complete(_run(args))
+    except (OSError, ValueError) as e:
+        parser.exit(1, "{}: error: {}\n".format(parser.prog, e))
+    print(_format_report(stats))
+
+
+if __name__ == "__main__":
+    main()
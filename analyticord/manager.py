@@ -0,0 +1,295 @@
+import asyncio
+import collections
+import logging
+import typing
+
+import aiohttp
+
+from analyticord import errors
+from analyticord.analyticord import API_BASE, AnalytiCord
+from analyticord.tracing import Tracer
+
+__all__ = ("AnalytiCordManager", "Tenant", "TenantStats")
+
+logger = logging.getLogger("analyticord.manager")
+
+_Request = collections.namedtuple(
+    "_Request", "future rtype endpoint auth kwargs queued_at")
+
+
+class TenantStats:
+    """Request statistics of a single :class:`Tenant`."""
+
+    def __init__(self):
+        #: Number of requests that succeeded
+        self.sent = 0
+
+        #: Number of requests that raised an error, including rate limits
+        self.failed = 0
+
+        #: Number of requests that were rate limited
+        self.rate_limited = 0
+
+        #: Total seconds requests spent waiting in the tenant's queue
+        self.queue_time = 0.0
+
+    def __str__(self):
+        return "sent: {0.sent}, failed: {0.failed}, rate limited: {0.rate_limited}, queue time: {0.queue_time:.3f}s".format(self)
+
+    __repr__ = __str__
+
+
+class Tenant(AnalytiCord):
+    """An :class:`AnalytiCord` whose requests are scheduled by an :class:`AnalytiCordManager`.
+
+    Tenants are created with :meth:`AnalytiCordManager.add_tenant` and are used
+    just like an :class:`AnalytiCord`, but share the session of their manager.
+    Each tenant runs its own updater loop, so a rate limited tenant only delays its own updates.
+    """
+
+    def __init__(self, manager: "AnalytiCordManager", name: str, token: str,
+                 user_token: str=None, weight: float=1):
+        super().__init__(
+            token,
+            user_token,
+            event_interval=manager.event_interval,
+            session=manager.session,
+            loop=manager.loop,
+            api_base=manager.api_base,
+            tracer=manager.tracer)
+
+        #: The :class:`AnalytiCordManager` scheduling this tenant's requests
+        self.manager = manager
+
+        #: Name of this tenant
+        self.name = name
+
+        #: Share of requests this tenant gets relative to other busy tenants
+        self.weight = weight
+
+        #: :class:`TenantStats` for this tenant
+        self.stats = TenantStats()
+
+        self.queue = collections.deque()  # type: typing.Deque[_Request]
+        self.vtime = 0.0
+        self.throttled_until = 0.0
+
+    def __str__(self):
+        return "Analyticord tenant {}. Fired {} events".format(self.name, self.sent_events)
+
+    async def _do_request(self, rtype: str, endpoint: str, auth, **kwargs):
+        return await self.manager._submit(self, rtype, endpoint, auth, kwargs)
+
+
+class AnalytiCordManager:
+    """Runs many bot tokens over one session.
+
+    Each tenant has its own request queue. Queued requests are sent by a fixed
+    number of workers, picking tenants by weighted fair queueing so that a busy
+    tenant cannot starve the others. A tenant that is rate limited is paused
+    without holding up the other tenants.
+
+    Example:
+
+    .. code-block:: python3
+
+        manager = AnalytiCordManager()
+        first = manager.add_tenant("first", "token")
+        second = manager.add_tenant("second", "other token", weight=2)
+        await manager.start()
+
+        first.messages.hook_bot(bot)
+        second.messages.hook_bot(other_bot)
+    """
+
+    def __init__(self,
+                 concurrency: int=4,
+                 event_interval: int=60,
+                 rate_limit_backoff: float=60,
+                 session: aiohttp.ClientSession=None,
+                 loop=None,
+                 api_base: str=API_BASE,
+                 tracer: Tracer=None):
+        """
+        :param concurrency: Maximum number of requests in flight across all tenants.
+        :param event_interval: The interval between sending event updates in seconds.
+        :param rate_limit_backoff: Seconds to pause a tenant for after it is rate limited.
+        :param api_base: Base url of the api, useful for pointing at a local server.
+        :param tracer: A :class:`analyticord.tracing.Tracer` to time hooks and requests with.
+        """
+        self.loop = loop or asyncio.get_event_loop()
+        self.session = session or aiohttp.ClientSession()
+
+        #: Maximum number of requests in flight
+        self.concurrency = concurrency
+
+        #: Interval between sending event updates
+        self.event_interval = event_interval
+
+        #: Seconds a rate limited tenant is paused for
+        self.rate_limit_backoff = rate_limit_backoff
+
+        self.api_base = api_base
+        self.tracer = tracer
+
+        #: Tenants by name
+        self.tenants = collections.OrderedDict()  # type: typing.Dict[str, Tenant]
+
+        self.workers = []  # type: typing.List[asyncio.Task]
+
+        self._vtime = 0.0
+        self._wakeup = None  # type: asyncio.Event
+
+    def __str__(self):
+        return "Analyticord manager with {} tenants".format(len(self.tenants))
+
+    @property
+    def stats(self) -> typing.Dict[str, TenantStats]:
+        """:class:`TenantStats` of each tenant by name."""
+        return {name: t.stats for name, t in self.tenants.items()}
+
+    def add_tenant(self, name: str, token: str, user_token: str=None,
+                   weight: float=1) -> Tenant:
+        """Add a bot token to this manager.
+
+        :param name: Unique name of the tenant.
+        :param token: The tenant's AnalytiCord bot token.
+        :param user_token: The tenant's AnalytiCord user token.
+        :param weight: Share of requests this tenant gets relative to other busy tenants.
+        :return: The new :class:`Tenant`.
+        """
+        if name in self.tenants:
+            raise ValueError("Tenant {} already exists.".format(name))
+        if weight <= 0:
+            raise ValueError("Tenant weight must be positive.")
+        tenant = Tenant(self, name, token, user_token, weight)
+        self.tenants[name] = tenant
+        return tenant
+
+    def remove_tenant(self, name: str):
+        """Remove a tenant, cancelling its updater loop and queued requests.
+
+        :param name: Name of the tenant.
+        """
+        tenant = self.tenants.pop(name)
+        if tenant.updater is not None:
+            tenant.updater.cancel()
+            tenant.updater = None
+        while tenant.queue:
+            tenant.queue.popleft().future.cancel()
+
+    async def start(self) -> dict:
+        """Fire a login event for every tenant and start their event updater loops.
+        Tenants that fail to log in still get an updater loop.
+
+        :return: Dict of login responses, or the error raised, by tenant name.
+        """
+        self._start_workers()
+        names = list(self.tenants)
+        resps = await asyncio.gather(
+            *(self.tenants[n].start() for n in names), return_exceptions=True)
+        for name, resp in zip(names, resps):
+            if isinstance(resp, Exception):
+                logger.error("Tenant %s failed to log in: %s", name, resp)
+        for tenant in self.tenants.values():
+            if tenant.updater is None:
+                tenant.updater = self.loop.create_task(tenant._update_events_loop())
+        return dict(zip(names, resps))
+
+    async def stop(self):
+        """Update all events of every tenant and stop the manager.
+        Tenants that are currently rate limited are not updated.
+        """
+        now = self.loop.time()
+        for tenant in self.tenants.values():
+            if tenant.updater is not None:
+                tenant.updater.cancel()
+                tenant.updater = None
+        await asyncio.gather(*(t._update_once(include_current=True)
+                               for t in self.tenants.values()
+                               if t.throttled_until <= now))
+        for worker in self.workers:
+            worker.cancel()
+        self.workers = []
+        for tenant in self.tenants.values():
+            while tenant.queue:
+                tenant.queue.popleft().future.cancel()
+
+    def _start_workers(self):
+        if self._wakeup is None:
+            # created here, from a coroutine on the manager's loop,
+            # so it is bound to that loop rather than the default one
+            self._wakeup = asyncio.Event()
+        while len(self.workers) < self.concurrency:
+            self.workers.append(self.loop.create_task(self._worker()))
+
+    def _submit(self, tenant: Tenant, rtype: str, endpoint: str, auth,
+                kwargs: dict) -> asyncio.Future:
+        self._start_workers()
+        if not tenant.queue:
+            # an idle tenant rejoins at the current virtual time,
+            # rather than spending credit built up while it was idle
+            tenant.vtime = max(tenant.vtime, self._vtime)
+        future = self.loop.create_future()
+        tenant.queue.append(
+            _Request(future, rtype, endpoint, auth, kwargs, self.loop.time()))
+        self._wakeup.set()
+        return future
+
+    async def _next_tenant(self) -> Tenant:
+        while True:
+            now = self.loop.time()
+            ready = None
+            resume_at = None
+            for tenant in self.tenants.values():
+                if not tenant.queue:
+                    continue
+                if tenant.throttled_until > now:
+                    if resume_at is None or tenant.throttled_until < resume_at:
+                        resume_at = tenant.throttled_until
+                elif ready is None or tenant.vtime < ready.vtime:
+                    ready = tenant
+
+            if ready is not None:
+                self._vtime = ready.vtime
+                ready.vtime += 1 / ready.weight
+                return ready
+
+            self._wakeup.clear()
+            timeout = None if resume_at is None else resume_at - now
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self):
+        while True:
+            tenant = await self._next_tenant()
+            request = tenant.queue.popleft()
+            if request.future.done():
+                continue
+            tenant.stats.queue_time += self.loop.time() - request.queued_at
+
+            try:
+                result = await AnalytiCord._do_request(
+                    tenant, request.rtype, request.endpoint, request.auth,
+                    **request.kwargs)
+            except asyncio.CancelledError:
+                request.future.cancel()
+                raise
+            except errors.RateLimit as e:
+                tenant.throttled_until = self.loop.time() + self.rate_limit_backoff
+                tenant.stats.rate_limited += 1
+                tenant.stats.failed += 1
+                logger.warning("Tenant %s rate limited, pausing for %ss",
+                               tenant.name, self.rate_limit_backoff)
+                if not request.future.done():
+                    request.future.set_exception(e)
+            except Exception as e:
+                tenant.stats.failed += 1
+                if not request.future.done():
+                    request.future.set_exception(e)
+            else:
+                tenant.stats.sent += 1
+                if not request.future.done():
+                    request.future.set_result(result)
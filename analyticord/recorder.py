@@ -0,0 +1,149 @@
+import logging
+import struct
+import time
+import typing
+
+__all__ = ("TraceRecorder", "read_trace")
+
+logger = logging.getLogger("analyticord.recorder")
+
+#: Magic bytes and format version at the start of every trace file.
+MAGIC = b"ACTR\x01"
+
+# Each record starts with a one byte tag.
+# Tags below _DEFINE are events of the event type with that index,
+# followed by a uint32 millisecond offset from the start of the trace.
+# _DEFINE is followed by a uint8 length and a utf-8 event name,
+# which is given the next free index.
+_DEFINE = 0xFF
+_EVENT = struct.Struct("<I")
+_LENGTH = struct.Struct("<B")
+
+_MAX_OFFSET = 0xFFFFFFFF
+_MAX_NAME = 0xFF
+
+
+class TraceRecorder:
+    """Records the timestamps and event types of hooked events into a compact binary trace.
+
+    Example:
+
+    .. code-block:: python3
+
+        with TraceRecorder("events.trace") as recorder:
+            analytics.recorder = recorder
+            ...
+
+    Each event costs five bytes in the trace file.
+    Traces can be replayed with the ``analyticord-replay`` console command.
+
+    Recording never raises into the hooks it is called from: once the recorder is closed,
+    :meth:`record` does nothing. Recording stops (with a logged warning) when the trace
+    reaches its maximum length of about 49 days or the file can't be written to,
+    and event types that can't be stored are skipped.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Path of the trace file to write to.
+        """
+        #: Path of the trace file
+        self.path = path
+
+        #: Whether the recorder is closed and no longer records events
+        self.closed = False
+
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.start = time.monotonic()
+        self.types = {}  # type: typing.Dict[str, int]
+        self.skipped = set()  # type: typing.Set[str]
+
+    def record(self, event_type: str):
+        """Record an event of the given type as happening now.
+
+        :param event_type: The AnalytiCord name of the event.
+        """
+        if self.closed or event_type in self.skipped:
+            return
+
+        offset = int((time.monotonic() - self.start) * 1000)
+        if offset > _MAX_OFFSET:
+            logger.warning("Trace %s reached its maximum length, recording stopped.", self.path)
+            self.close()
+            return
+
+        try:
+            index = self.types.get(event_type)
+            if index is None:
+                index = self._define(event_type)
+                if index is None:
+                    return
+            self.file.write(bytes((index,)) + _EVENT.pack(offset))
+        except OSError as e:
+            logger.error("Failed to write to trace %s, recording stopped: %s", self.path, e)
+            self.close()
+
+    def _define(self, event_type: str) -> typing.Optional[int]:
+        index = len(self.types)
+        name = event_type.encode("utf-8")
+        if index >= _DEFINE or len(name) > _MAX_NAME:
+            logger.warning("Can't record event type %s to trace %s, skipping it.",
+                           event_type, self.path)
+            self.skipped.add(event_type)
+            return None
+        self.file.write(bytes((_DEFINE,)) + _LENGTH.pack(len(name)) + name)
+        self.types[event_type] = index
+        return index
+
+    def close(self):
+        """Flush and close the trace file. Events recorded after this are ignored."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.file.close()
+        except OSError as e:
+            logger.error("Failed to close trace %s: %s", self.path, e)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def read_trace(path: str) -> typing.Iterator[typing.Tuple[float, str]]:
+    """Read a trace written by :class:`TraceRecorder`.
+
+    :param path: Path of the trace file.
+    :return: Iterator of ``(seconds since start, event type)`` tuples.
+    :raises: :class:`ValueError` if the file is not a valid trace.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("{} is not an analyticord trace.".format(path))
+
+        types = []  # type: typing.List[str]
+        while True:
+            tag = f.read(1)
+            if not tag:
+                return
+            if tag[0] == _DEFINE:
+                length, = _LENGTH.unpack(_read(f, _LENGTH.size, path))
+                try:
+                    types.append(_read(f, length, path).decode("utf-8"))
+                except UnicodeDecodeError:
+                    raise ValueError("Invalid event type in trace: {}.".format(path))
+                continue
+            if tag[0] >= len(types):
+                raise ValueError("Undefined event type in trace: {}.".format(path))
+            offset, = _EVENT.unpack(_read(f, _EVENT.size, path))
+            yield offset / 1000, types[tag[0]]
+
+
+def _read(f, size: int, path: str) -> bytes:
+    data = f.read(size)
+    if len(data) < size:
+        raise ValueError("Truncated trace: {}.".format(path))
+    return data
@@ -0,0 +1,165 @@
+import logging
+import random
+import time
+import typing
+
+try:
+    import contextvars
+except ImportError:  # python < 3.7
+    contextvars = None
+
+__all__ = ("Tracer",)
+
+logger = logging.getLogger("analyticord.tracing")
+
+# the sampling decision of the outermost span, inherited by the spans inside it
+if contextvars is not None:
+    _sampled_var = contextvars.ContextVar("analyticord_sampled", default=None)
+else:
+    _sampled_var = None
+
+
+class _NullSpan:
+    """Span that does nothing, used when tracing is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _UnsampledSpan:
+    """Span that isn't timed, but makes the spans inside it unsampled too."""
+
+    def __init__(self):
+        self.token = None
+
+    def __enter__(self):
+        if _sampled_var is not None:
+            self.token = _sampled_var.set(False)
+        return self
+
+    def __exit__(self, *_):
+        if self.token is not None:
+            _sampled_var.reset(self.token)
+        return False
+
+
+class _Span:
+    def __init__(self, tracer: "Tracer", name: str, attrs: dict, sampled: bool):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.sampled = sampled
+        self.otel_span = None
+        self.token = None
+
+    def __enter__(self):
+        if _sampled_var is not None:
+            self.token = _sampled_var.set(self.sampled)
+        if self.sampled and self.tracer.otel_tracer is not None:
+            self.otel_span = self.tracer.otel_tracer.start_as_current_span(
+                self.name, attributes=self.attrs)
+            self.otel_span.__enter__()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        if self.token is not None:
+            _sampled_var.reset(self.token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+
+        tracer = self.tracer
+        if tracer.slow_threshold is not None and duration >= tracer.slow_threshold:
+            logger.warning("Slow %s for %s: %.3fs (%s)", self.name,
+                           self.attrs.get("event", "-"), duration, self.attrs)
+        if self.sampled:
+            # tracing must never break the hooks and requests it times
+            try:
+                if self.otel_span is not None:
+                    self.otel_span.__exit__(exc_type, exc, tb)
+                if tracer.callback is not None:
+                    tracer.callback(self.name, duration, self.attrs)
+            except Exception:
+                logger.exception("Tracing %s failed", self.name)
+        return False
+
+
+class Tracer:
+    """Times the analytics hot path.
+
+    Pass an instance as the ``tracer`` of an :class:`analyticord.AnalytiCord` to
+    have the following spans timed:
+
+    ========= ==============================================================
+    Span      Timed section
+    ========= ==============================================================
+    hook      A whole invocation of a hooked discord.py listener.
+    lock      Waiting on the update lock of a :class:`MessageEventProxy`.
+    queue     Waiting for a free request slot.
+    http      A request to the api, including reading the response.
+    decode    Decoding a response body.
+    ========= ==============================================================
+
+    Spans may nest, for example a ``hook`` span contains the ``http`` span of the
+    event it sent. When an :class:`AnalytiCord` has no tracer, none of this runs.
+
+    Example:
+
+    .. code-block:: python3
+
+        def on_span(name, duration, attrs):
+            stats[name].append(duration)
+
+        analytics = AnalytiCord("token", tracer=Tracer(on_span, sample_rate=0.01))
+    """
+
+    def __init__(self,
+                 callback: typing.Callable[[str, float, dict], None]=None,
+                 sample_rate: float=1.0,
+                 slow_threshold: float=None,
+                 otel_tracer=None):
+        """
+        :param callback:
+            Called with the span name, duration in seconds and a dict of attributes
+            when a sampled span finishes. Exceptions it raises are logged, not propagated.
+        :param sample_rate:
+            Fraction of spans to pass to the callback and otel tracer.
+            On python 3.7+, this is decided once for the outermost span,
+            and the spans inside it share that decision.
+        :param slow_threshold:
+            Spans taking at least this many seconds are logged as warnings
+            to the ``analyticord.tracing`` logger, whether or not they are sampled.
+        :param otel_tracer:
+            An OpenTelemetry tracer (or anything with a compatible ``start_as_current_span``)
+            to create spans on.
+        """
+        self.callback = callback
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.otel_tracer = otel_tracer
+
+    def _sampled(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def span(self, name: str, **attrs):
+        """Context manager timing a span.
+
+        :param name: Name of the span.
+        :param attrs:
+            Attributes of the span, ``event`` is included in slow call logs.
+            Attributes that are None are left out.
+        """
+        sampled = None if _sampled_var is None else _sampled_var.get()
+        if sampled is None:
+            sampled = self._sampled()
+        if not sampled and self.slow_threshold is None:
+            return _UnsampledSpan()
+        attrs = {k: v for k, v in attrs.items() if v is not None}
+        return _Span(self, name, attrs, sampled)
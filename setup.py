@@ -47,4 +47,8 @@ setup(
             "sphinxcontrib-asyncio"
             ]},
     packages=find_packages(),
+    entry_points={
+        "console_scripts": [
+            "analyticord-replay = analyticord.cli:main",
+        ]},
 )
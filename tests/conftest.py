@@ -5,8 +5,13 @@ import pytest
 
 from analyticord import AnalytiCord
 
-bot_token = os.environ["ANALYTICORD_BOT"]
-user_token = os.environ["ANALYTICORD_USER"]
+bot_token = os.environ.get("ANALYTICORD_BOT")
+user_token = os.environ.get("ANALYTICORD_USER")
+
+#: Marks tests that talk to the live api, skipped unless both tokens are set
+requires_tokens = pytest.mark.skipif(
+    bot_token is None or user_token is None,
+    reason="ANALYTICORD_BOT and ANALYTICORD_USER must be set to test against the api")
 
 
 @pytest.fixture(scope="module")
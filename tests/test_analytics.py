@@ -3,7 +3,9 @@ import pytest
 from analyticord import AnalytiCord
 from analyticord.errors import WrongToken
 
-pytestmark = pytest.mark.asyncio
+from .conftest import requires_tokens
+
+pytestmark = [pytest.mark.asyncio, requires_tokens]
 
 
 async def test_start(analytics: AnalytiCord):
@@ -40,6 +42,19 @@ async def test_register(analytics: AnalytiCord):
     assert "on_message" in bot.events
 
 
+async def test_register_guild_details(analytics: AnalytiCord):
+    class DummyBot:
+        def __init__(self):
+            self.events = {}
+
+        def add_listener(self, callback, name):
+            self.events[name] = callback
+
+    bot = DummyBot()
+    analytics.guildDetails.hook_bot(bot)
+    assert {"on_guild_join", "on_guild_update", "on_guild_remove"} <= set(bot.events)
+
+
 async def test_fail():
     try:
         t = AnalytiCord("fail_token")
@@ -48,5 +63,11 @@ async def test_fail():
         pass
 
 
+async def test_bot_info_bulk(analytics: AnalytiCord):
+    ids = [bot["id"] for bot in await analytics.bot_list()]
+    results, failed = await analytics.bot_info_bulk(ids + ids)
+    assert len(results) + len(failed) == len(set(ids))
+
+
 async def test_stop(analytics: AnalytiCord):
     await analytics.stop()
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from analyticord import AnalytiCord
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_bot_info_bulk_errors():
+    analytics = AnalytiCord("token", "user_token", session=object())
+    requested = []
+
+    async def _do_request(rtype, endpoint, auth, params):
+        requested.append(params["id"])
+        if params["id"] == 2:
+            raise asyncio.TimeoutError()
+        return {"id": params["id"]}
+
+    analytics._do_request = _do_request
+    results, failed = await analytics.bot_info_bulk([1, 2, 3, 1, 3], limit=2)
+
+    assert sorted(requested) == [1, 2, 3]
+    assert results == {1: {"id": 1}, 3: {"id": 3}}
+    assert list(failed) == [2]
+    assert isinstance(failed[2], asyncio.TimeoutError)
+
+
+async def test_bot_info_bulk_cancelled():
+    analytics = AnalytiCord("token", "user_token", session=object())
+    requested = []
+
+    async def _do_request(rtype, endpoint, auth, params):
+        requested.append(params["id"])
+        await asyncio.sleep(0.05)
+        return {"id": params["id"]}
+
+    analytics._do_request = _do_request
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(analytics.bot_info_bulk(range(20), limit=2), 0.06)
+
+    await asyncio.sleep(0.2)
+    assert len(requested) <= 4
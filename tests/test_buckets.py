@@ -0,0 +1,103 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from analyticord import AnalytiCord
+from analyticord.buckets import CounterRing
+
+
+def test_pending_buckets():
+    ring = CounterRing(60, 3)
+    ring.add(now=0)
+    ring.add(now=59)
+    ring.add(2, now=61)
+
+    assert ring.pending(now=90) == [(0, 2)]
+    assert ring.pending(include_current=True, now=90) == [(0, 2), (1, 2)]
+
+    ring.remove(0, 2)
+    assert ring.total == 2
+
+
+def test_overwrite_drops():
+    ring = CounterRing(60, 2)
+    ring.add(now=0)
+    ring.add(now=120)
+    assert ring.dropped == 1
+    assert ring.pending(include_current=True, now=120) == [(2, 1)]
+
+
+@pytest.mark.asyncio
+async def test_failed_update_backfills():
+    analytics = AnalytiCord("token", event_interval=60, session=object())
+    sent = []
+    failing = [True]
+
+    async def _do_request(rtype, endpoint, auth, event, data):
+        if failing:
+            raise aiohttp.ClientError()
+        sent.append(data)
+        return {"status": "ok"}
+
+    analytics._do_request = _do_request
+    messages = analytics.messages
+    messages.buckets.add(now=0)
+    messages.buckets.add(2, now=60)
+
+    await analytics._update_once()
+    assert messages.counter == 3
+    assert not sent
+
+    failing.clear()
+    await analytics._update_once()
+    assert messages.counter == 0
+    assert [(d["timestamp"], d["data"]) for d in sent] == [(0, 1), (60, 2)]
+
+
+@pytest.mark.asyncio
+async def test_update_loop_survives_errors():
+    analytics = AnalytiCord("token", event_interval=0.01, session=object())
+    calls = []
+
+    async def _update_once():
+        calls.append(None)
+        if len(calls) == 1:
+            raise RuntimeError("outage")
+
+    analytics._update_once = _update_once
+    updater = asyncio.ensure_future(analytics._update_events_loop())
+    await asyncio.sleep(0.05)
+
+    assert not updater.done()
+    assert len(calls) > 1
+    updater.cancel()
+
+
+@pytest.mark.asyncio
+async def test_sub_second_buckets_keep_timestamps():
+    analytics = AnalytiCord("token", event_interval=0.1, session=object())
+    sent = []
+
+    async def _do_request(rtype, endpoint, auth, event, data):
+        sent.append(data)
+        return {"status": "ok"}
+
+    analytics._do_request = _do_request
+    analytics.messages.buckets.add(now=100.0)
+    analytics.messages.buckets.add(now=100.5)
+    await analytics._update_once()
+
+    assert [d["timestamp"] for d in sent] == [100.0, 100.5]
+
+
+@pytest.mark.asyncio
+async def test_set_counter():
+    messages = AnalytiCord("token", session=object()).messages
+    messages.buckets.add(now=0)
+    await messages.increment()
+
+    messages.counter = 0
+    assert messages.counter == 0
+    messages.counter = 5
+    assert messages.counter == 5
@@ -0,0 +1,140 @@
+import json
+
+import aiohttp
+import pytest
+
+from analyticord import AnalytiCord
+
+pytestmark = pytest.mark.asyncio
+
+
+class Guild:
+    def __init__(self, id: int, name: str, member_count: int=1):
+        self.id = id
+        self.name = name
+        self.member_count = member_count
+        self.owner_id = 1
+
+
+class Member:
+    def __init__(self, guild: Guild):
+        self.guild = guild
+
+
+class DummyBot:
+    def __init__(self, *guilds):
+        self.guilds = list(guilds)
+        self.events = {}
+
+    def add_listener(self, callback, name):
+        self.events[name] = callback
+
+    def get_guild(self, id):
+        return next((g for g in self.guilds if g.id == id), None)
+
+
+def _analytics() -> AnalytiCord:
+    """AnalytiCord that records sent guild details, raising if ``failing`` is set."""
+    analytics = AnalytiCord("token", session=object())
+    analytics.sent = []
+    analytics.failing = False
+
+    async def send(event_type, data, timestamp=None):
+        if analytics.failing:
+            raise aiohttp.ClientError()
+        analytics.sent.append(json.loads(data))
+        return {"status": "ok"}
+
+    analytics.send = send
+    return analytics
+
+
+async def test_deltas():
+    analytics = _analytics()
+    first, second = Guild(1, "first"), Guild(2, "second")
+    bot = DummyBot(first, second)
+    proxy = analytics.guildDetails
+    proxy.hook_bot(bot)
+
+    await proxy._update_once()
+    update, = analytics.sent
+    assert update["full"]
+    assert [g["id"] for g in update["guilds"]] == ["1", "2"]
+
+    # an update that doesn't change the reported details isn't sent
+    await bot.events["on_guild_update"](first, first)
+    await proxy._update_once()
+    assert len(analytics.sent) == 1
+
+    first.name = "renamed"
+    await bot.events["on_guild_update"](first, first)
+    third = Guild(3, "third")
+    bot.guilds.append(third)
+    await bot.events["on_guild_join"](third)
+    bot.guilds.remove(second)
+    await bot.events["on_guild_remove"](second)
+    await proxy._update_once()
+    update = analytics.sent[-1]
+    assert not update["full"]
+    assert sorted(g["id"] for g in update["guilds"]) == ["1", "3"]
+    assert update["removed"] == ["2"]
+
+    third.member_count += 1
+    await bot.events["on_member_join"](Member(third))
+    await proxy._update_once()
+    assert analytics.sent[-1]["guilds"] == [proxy.details(third)]
+
+
+async def test_failed_update_is_retried():
+    analytics = _analytics()
+    first, second = Guild(1, "first"), Guild(2, "second")
+    bot = DummyBot(first, second)
+    proxy = analytics.guildDetails
+    proxy.hook_bot(bot)
+    await proxy._update_once()
+
+    first.name = "renamed"
+    await bot.events["on_guild_update"](first, first)
+    bot.guilds.remove(second)
+    await bot.events["on_guild_remove"](second)
+
+    analytics.failing = True
+    await proxy._update_once()
+    assert proxy.dirty == {1}
+    assert proxy.removed == {2}
+
+    analytics.failing = False
+    await proxy._update_once()
+    update = analytics.sent[-1]
+    assert [g["name"] for g in update["guilds"]] == ["renamed"]
+    assert update["removed"] == ["2"]
+
+
+async def test_resync_cadence():
+    analytics = _analytics()
+    proxy = analytics.guildDetails
+    proxy.resync_every = 3
+    proxy.hook_bot(DummyBot(Guild(1, "first")))
+
+    fulls = []
+    for i in range(7):
+        before = len(analytics.sent)
+        await proxy._update_once()
+        if len(analytics.sent) > before and analytics.sent[-1]["full"]:
+            fulls.append(i)
+    assert fulls == [0, 3, 6]
+
+
+async def test_extra_trigger_event():
+    analytics = _analytics()
+    proxy = analytics.guildDetails
+    bot = DummyBot(Guild(1, "first"))
+    proxy.hook_bot(bot, "on_guild_update")
+    proxy.hook_bot(bot, "on_ready")
+    await proxy._update_once()
+    await proxy._update_once()
+    assert len(analytics.sent) == 1
+
+    await bot.events["on_ready"]()
+    await proxy._update_once()
+    assert analytics.sent[-1]["full"]
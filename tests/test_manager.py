@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from analyticord import AnalytiCord, AnalytiCordManager, Tenant
+from analyticord.errors import RateLimit
+
+from .conftest import bot_token, requires_tokens
+
+pytestmark = pytest.mark.asyncio
+
+
+@requires_tokens
+async def test_tenant_send():
+    manager = AnalytiCordManager()
+    tenant = manager.add_tenant("bot", bot_token)
+    await manager.start()
+
+    resp = await tenant.messages.send(69)
+    assert "status" in resp
+    assert manager.stats["bot"].sent == 2
+
+    await manager.stop()
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    """Patch requests to record which tenant sent them, rate limiting the "limited" tenant."""
+    order = []
+
+    async def _do_request(tenant, rtype, endpoint, auth, **kwargs):
+        order.append(tenant.name)
+        await asyncio.sleep(0)
+        if tenant.name == "limited":
+            raise RateLimit(error="rateLimit", description="", status=429)
+        return {"status": "ok"}
+
+    monkeypatch.setattr(AnalytiCord, "_do_request", _do_request)
+    return order
+
+
+def _send(tenant: Tenant, n: int) -> list:
+    return [asyncio.ensure_future(tenant.send("x", 1)) for _ in range(n)]
+
+
+async def test_weighted_order(dispatched):
+    manager = AnalytiCordManager(concurrency=1, session=object())
+    light = manager.add_tenant("light", "token")
+    heavy = manager.add_tenant("heavy", "token", weight=3)
+
+    await asyncio.gather(*_send(light, 4), *_send(heavy, 12))
+
+    for i in range(0, 16, 4):
+        assert dispatched[i:i + 4].count("light") == 1
+    assert manager.stats["heavy"].sent == 12
+
+    await manager.stop()
+
+
+async def test_idle_tenant_catches_up(dispatched):
+    manager = AnalytiCordManager(concurrency=1, session=object())
+    idle = manager.add_tenant("idle", "token")
+    busy = manager.add_tenant("busy", "token")
+
+    await asyncio.gather(*_send(busy, 5))
+    del dispatched[:]
+    await asyncio.gather(*_send(idle, 4), *_send(busy, 4))
+
+    # without catching up, the idle tenant would send all of its requests first
+    assert dispatched[:4] != ["idle"] * 4
+
+    await manager.stop()
+
+
+async def test_rate_limit_pauses_tenant(dispatched):
+    manager = AnalytiCordManager(concurrency=1, rate_limit_backoff=60, session=object())
+    limited = manager.add_tenant("limited", "token")
+    ok = manager.add_tenant("ok", "token")
+
+    limited_sends = _send(limited, 2)
+    await asyncio.gather(*_send(ok, 3))
+
+    assert isinstance(limited_sends[0].exception(), RateLimit)
+    assert not limited_sends[1].done()
+    assert dispatched.count("limited") == 1
+    assert manager.stats["limited"].rate_limited == 1
+    assert manager.stats["ok"].sent == 3
+
+    manager.remove_tenant("limited")
+    await asyncio.sleep(0)
+    assert limited_sends[1].cancelled()
+
+    await manager.stop()
+
+
+async def test_rate_limit_only_delays_own_updates(dispatched):
+    manager = AnalytiCordManager(
+        concurrency=1, event_interval=0.05, rate_limit_backoff=60, session=object())
+    limited = manager.add_tenant("limited", "token")
+    quiet = manager.add_tenant("quiet", "token")
+    await manager.start()
+    del dispatched[:]
+
+    for _ in range(6):
+        await limited.messages.increment()
+        await quiet.messages.increment()
+        await asyncio.sleep(0.05)
+
+    assert "limited" not in dispatched
+    assert dispatched.count("quiet") >= 3
+
+    await manager.stop()
@@ -0,0 +1,52 @@
+import pytest
+
+from analyticord.recorder import MAGIC, TraceRecorder, read_trace
+
+
+def test_round_trip(tmpdir):
+    path = str(tmpdir.join("events.trace"))
+    with TraceRecorder(path) as recorder:
+        recorder.record("messages")
+        recorder.record("guildJoin")
+        recorder.record("messages")
+
+    trace = list(read_trace(path))
+    assert [name for _, name in trace] == ["messages", "guildJoin", "messages"]
+    assert all(offset >= 0 for offset, _ in trace)
+
+
+def test_closed_recorder(tmpdir):
+    path = str(tmpdir.join("events.trace"))
+    recorder = TraceRecorder(path)
+    recorder.record("messages")
+    recorder.close()
+    recorder.record("messages")
+
+    assert [name for _, name in read_trace(path)] == ["messages"]
+
+
+def test_unrecordable_events(tmpdir, monkeypatch):
+    path = str(tmpdir.join("events.trace"))
+    with TraceRecorder(path) as recorder:
+        recorder.record("x" * 256)
+        recorder.record("messages")
+
+        start = recorder.start
+        monkeypatch.setattr(recorder, "start", start - 50 * 24 * 60 * 60)
+        recorder.record("messages")
+        assert recorder.closed
+
+    assert [name for _, name in read_trace(path)] == ["messages"]
+
+
+@pytest.mark.parametrize("body", [
+    b"\x00\x00\x00\x00\x00",  # event with no type defined
+    b"\xff",  # define with no length
+    b"\xff\x08mess",  # define with a truncated name
+    b"\xff\x08messages\x00\x00",  # truncated event
+])
+def test_corrupt_trace(tmpdir, body):
+    path = tmpdir.join("events.trace")
+    path.write_binary(MAGIC + body)
+    with pytest.raises(ValueError):
+        list(read_trace(str(path)))
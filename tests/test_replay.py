@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from analyticord.cli import ReplayAnalytiCord, _format_report, replay
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_replay():
+    # a huge interval keeps all messages in a single bucket
+    analytics = ReplayAnalytiCord("token", event_interval=10 ** 9, session=object())
+
+    async def _do_request(rtype, endpoint, auth, event, data):
+        return {"status": "ok"}
+
+    analytics._do_request = _do_request
+    trace = [(0, "messages"), (0.5, "guildLeave"), (1, "guildLeave"), (1.5, "messages"),
+             (1.6, "guildDetails"), (1.7, "guildDetails")]
+    stats = await replay(analytics, trace, speed=100)
+
+    assert stats["events"] == {"messages": 2, "guildLeave": 2, "guildDetails": 2}
+    # guild details are batched into one update, like messages
+    assert stats["requests"] == {"messages": 1, "guildLeave": 2, "guildDetails": 1}
+    assert not stats["failures"]
+    assert stats["elapsed"] >= 0.015
+    assert 0 <= stats["mean_lag"] <= stats["max_lag"]
+    assert stats["max_pending"] >= 1
+
+    report = _format_report(stats)
+    assert "Replayed 6 events" in report
+    assert "guildLeave" in report
+
+
+async def test_replay_failures():
+    analytics = ReplayAnalytiCord("token", session=object())
+
+    async def _do_request(rtype, endpoint, auth, event, data):
+        raise asyncio.TimeoutError()
+
+    analytics._do_request = _do_request
+    stats = await replay(analytics, [(0, "guildLeave"), (0, "guildLeave")], speed=100)
+
+    assert stats["failures"] == {"guildLeave": 2}
+    assert stats["max_lag"] >= 0
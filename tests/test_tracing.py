@@ -0,0 +1,84 @@
+import logging
+import random
+
+import pytest
+
+from analyticord import AnalytiCord
+from analyticord.tracing import Tracer
+
+
+def test_span_callback():
+    spans = []
+    tracer = Tracer(lambda *span: spans.append(span))
+    with tracer.span("hook", event="messages"):
+        pass
+
+    (name, duration, attrs), = spans
+    assert name == "hook"
+    assert duration >= 0
+    assert attrs == {"event": "messages"}
+
+
+def test_unsampled_span():
+    spans = []
+    tracer = Tracer(lambda *span: spans.append(span), sample_rate=0)
+    with tracer.span("hook"):
+        pass
+    assert not spans
+
+
+class _Response:
+    status = 200
+
+    async def json(self):
+        return {"status": "ok"}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        pass
+
+
+class _Session:
+    def request(self, *_, **__):
+        return _Response()
+
+
+@pytest.mark.asyncio
+async def test_slow_send_logs_event(caplog):
+    spans = []
+    tracer = Tracer(lambda *span: spans.append(span), slow_threshold=0)
+    analytics = AnalytiCord("token", session=_Session(), tracer=tracer)
+
+    with caplog.at_level(logging.WARNING, "analyticord.tracing"):
+        await analytics.send("messages", 1)
+
+    assert [name for name, _, _ in spans] == ["decode", "http"]
+    assert all(attrs["event"] == "messages" for _, _, attrs in spans)
+    assert "Slow http for messages" in caplog.text
+
+
+def test_callback_errors_are_logged(caplog):
+    def callback(*_):
+        raise RuntimeError("broken callback")
+
+    with Tracer(callback).span("hook"):
+        pass
+    assert "broken callback" in caplog.text
+
+
+@pytest.mark.parametrize("draws, expected", [
+    ([0.1, 0.9], ["http", "hook"]),
+    ([0.9, 0.1], []),
+])
+def test_children_inherit_sampling(monkeypatch, draws, expected):
+    draws = iter(draws)
+    monkeypatch.setattr(random, "random", lambda: next(draws))
+    spans = []
+    tracer = Tracer(lambda *span: spans.append(span), sample_rate=0.5)
+
+    with tracer.span("hook"):
+        with tracer.span("http"):
+            pass
+    assert [name for name, _, _ in spans] == expected